@@ -8,13 +8,37 @@ class Settings(BaseSettings):
     groq_api_key: str = Field(..., env="GROQ_API_KEY")
     groq_base_url: str = Field("https://api.groq.ai/v1", env="GROQ_BASE_URL")
     groq_model: str = Field("gpt-neo-3.9b", env="GROQ_MODEL")  # default, override in env
+    groq_max_concurrency: int = Field(8, env="GROQ_MAX_CONCURRENCY")  # parallel requests per process
+
+    # Vector store: "sqlite-vec" (embedded, default) or "chroma"
+    vector_backend: str = Field("sqlite-vec", env="VECTOR_BACKEND")
+    sqlite_vec_path: str = Field("./vectors.db", env="SQLITE_VEC_PATH")
+    # Search an int8-quantized index and re-rank candidates in float32 (sqlite-vec only)
+    use_int8: bool = Field(False, env="USE_INT8")
 
     # Chroma DB
     chroma_persist_dir: str = Field("./chroma_db", env="CHROMA_PERSIST_DIR")
+    # Set CHROMA_HOST to use a Chroma server (see docker-compose.yml) instead of the embedded store
+    chroma_host: Optional[str] = Field(None, env="CHROMA_HOST")
+    chroma_port: int = Field(8001, env="CHROMA_PORT")
+    memory_flush_interval_ms: int = Field(200, env="MEMORY_FLUSH_INTERVAL_MS")
+    memory_flush_batch_size: int = Field(64, env="MEMORY_FLUSH_BATCH_SIZE")
+
+    # Embeddings
+    embedding_model: str = Field("sentence-transformers/all-MiniLM-L6-v2", env="EMBEDDING_MODEL")
+    embedding_batch_size: int = Field(32, env="EMBEDDING_BATCH_SIZE")
+    embedding_batch_timeout_ms: float = Field(5.0, env="EMBEDDING_BATCH_TIMEOUT_MS")
+
+    # Semantic prompt cache: max cosine distance for a request to count as a repeat
+    prompt_cache_threshold: float = Field(0.05, env="PROMPT_CACHE_THRESHOLD")
+    prompt_cache_ttl_s: float = Field(3600, env="PROMPT_CACHE_TTL_S")
+    prompt_cache_max_entries: int = Field(10000, env="PROMPT_CACHE_MAX_ENTRIES")  # per route
 
     # App
     app_host: str = Field("0.0.0.0", env="APP_HOST")
     app_port: int = Field(8000, env="APP_PORT")
+    # Each worker holds its own histories, caches and Chroma client; raise only with a shared Chroma
+    app_workers: int = Field(1, env="APP_WORKERS")
 
     log_level: str = Field("INFO", env="LOG_LEVEL")
 
@@ -0,0 +1,60 @@
+# app/main.py
+"""
+FastAPI entrypoint. Launch with:
+uvicorn app.main:app --reload
+"""
+
+import logging
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from app.config import settings
+from app.routes import generate, memory
+from app.services.groq_client import get_groq_client, close_groq_client
+from app.services.embedder import close_embedder
+from app.services.analyzer import start_executor, shutdown_executor
+import asyncio
+
+# Setup logging
+logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO),
+                    format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+app = FastAPI(
+    title="AI Author Agent",
+    version="0.1.0",
+    description="FastAPI app using Groq + ChromaDB to generate content in user's style.",
+    default_response_class=ORJSONResponse,
+)
+
+# Include routers
+app.include_router(generate.router)
+app.include_router(memory.router)
+
+@app.on_event("startup")
+async def startup():
+    logger.info("Starting up app and initializing Groq client...")
+    # Start the analyzer's worker pool before anything else spawns threads
+    start_executor()
+    # Ensure groq client initialized
+    get_groq_client()
+    # Ensure vector store collection initialized
+    from app.services.memory import _ensure_collection as ensure_memory, start_flusher
+    await asyncio.to_thread(ensure_memory)
+    start_flusher()
+    # Open the prompt cache collections (and run any index backfill) off the event loop
+    from app.services.prompt_cache import warm_up as warm_prompt_cache
+    await asyncio.to_thread(warm_prompt_cache)
+    # Load the embedding model off the event loop before serving requests
+    from app.services.embedder import load as load_embedder
+    await asyncio.to_thread(load_embedder)
+    logger.info("Startup complete.")
+
+@app.on_event("shutdown")
+async def shutdown():
+    logger.info("Shutting down, flushing memory writes and closing Groq client...")
+    from app.services.memory import stop_flusher
+    await stop_flusher()
+    await close_groq_client()
+    await close_embedder()
+    shutdown_executor()
+    logger.info("Shutdown complete.")
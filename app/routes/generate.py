@@ -1,79 +1,144 @@
 # app/routes/generate.py
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.models.schemas import GenerateBlogRequest, GenerateResponse, GenerateSocialRequest
 from app.services.groq_client import get_groq_client
-from app.services import memory, analyzer
-from collections import defaultdict
+from app.services import memory, analyzer, prompt_cache
+from collections import defaultdict, deque
+from typing import Optional
 import logging
+import orjson
 
 router = APIRouter(prefix="/generate", tags=["generate"])
 logger = logging.getLogger(__name__)
 
-# Separate histories for each type and each user
-blog_histories = defaultdict(list)   # user_id -> blog exchanges
-social_histories = defaultdict(list) # user_id -> social exchanges
+# Number of recent exchanges included in the prompt
+HISTORY_WINDOW = 5
+
+
+class PerUserHistory:
+    """
+    Last HISTORY_WINDOW exchanges for one user, with the prompt-ready joined
+    string rebuilt only when an exchange is appended.
+    """
+
+    def __init__(self):
+        self.snippets = deque(maxlen=HISTORY_WINDOW)
+        self.joined = ""
 
-MAX_HISTORY = 20
+    def append(self, snippet: str):
+        self.snippets.append(snippet)
+        self.joined = "\n".join(self.snippets)
+
+
+# Separate histories for each type and each user
+blog_histories = defaultdict(PerUserHistory)   # user_id -> blog exchanges
+social_histories = defaultdict(PerUserHistory) # user_id -> social exchanges
+
+# Static system prompts; only the dynamic fields are filled per request
+_BLOG_TEMPLATE = (
+    "You are a professional blog writer.\n"
+    "Your ONLY job is to create engaging, structured, long-form blog posts.\n"
+    "Do not answer general questions. If the request is off-topic, "
+    "politely explain that you can only help with blog writing.\n\n"
+    "Follow this structure:\n"
+    "- Catchy introduction (hook)\n"
+    "- Main sections with clear headings\n"
+    "- Engaging examples and explanations\n"
+    "- Concise conclusion with a call-to-action\n\n"
+    "Past posts/patterns:\n{past}\n\n"
+    "Recent conversation:\n{history}\n\n"
+    "User request:\n{prompt}"
+)
+
+_SOCIAL_TEMPLATE = (
+    "You are a **social media strategist and content creator**.\n"
+    "Your ONLY job is to generate **short-form social content** "
+    "(tweets, LinkedIn posts, Instagram captions, content ideas).\n"
+    "You must NEVER answer general knowledge questions or unrelated topics.\n"
+    "If the user asks something outside social media content, politely remind them "
+    "that you can only create posts and ideas.\n\n"
+    "Use the following context to maintain style and continuity:\n\n"
+    "Past posts/patterns:\n{past}\n\n"
+    "Recent conversation:\n{history}\n\n"
+    "User request:\n{prompt}"
+)
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    """Format one server-sent event with a JSON payload."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {orjson.dumps(data).decode()}\n\n"
 
 # ---------------- BLOG ---------------- #
 @router.post("/blog")
 async def generate_blog_route(request: GenerateBlogRequest):
     """
-    Generate long-form blog content.
+    Generate long-form blog content, streamed as server-sent events
+    (`data: {"text": ...}` deltas followed by a `done` event with metadata).
     User-specific memory + conversation history.
     """
     try:
         client = get_groq_client()
 
-        # --- 1. Retrieve user-specific long-term memory ---
-        past_context = memory.query(f"{request.user_id}:{request.prompt}", top_k=3)
-
-        # --- 2. Include this user's blog history ---
+        # --- 1. Include this user's blog history ---
         history = blog_histories[request.user_id]
-        conversation_snippets = "\n".join(history[-5:])
-
-        # --- 3. Build blog-specific system prompt ---
-        full_prompt = (
-            "You are a professional blog writer.\n"
-            "Your ONLY job is to create engaging, structured, long-form blog posts.\n"
-            "Do not answer general questions. If the request is off-topic, "
-            "politely explain that you can only help with blog writing.\n\n"
-            "Follow this structure:\n"
-            "- Catchy introduction (hook)\n"
-            "- Main sections with clear headings\n"
-            "- Engaging examples and explanations\n"
-            "- Concise conclusion with a call-to-action\n\n"
-            f"Past posts/patterns:\n{past_context}\n\n"
-            f"Recent conversation:\n{conversation_snippets}\n\n"
-            f"User request:\n{request.prompt}"
-        )
-
-        # --- 4. Call LLM ---
-        text = await client.generate_text(
-            prompt=full_prompt,
-            model=request.model,
-            max_tokens=request.max_tokens,
-            temperature=request.temperature
-        )
 
-        # --- 5. Update user-specific memory + history ---
-        memory.add(f"{request.user_id}:{request.prompt}", text)
-        history.append(f"User: {request.prompt}\nAI: {text}")
+        # --- 2. Serve near-repeat requests from the cache ---
+        prompt_embed = await memory.embed_text(request.prompt)
+        cached = await prompt_cache.lookup("blog", request.user_id, prompt_embed, model=request.model)
 
-        # Trim history
-        if len(history) > MAX_HISTORY:
-            history.pop(0)
+        if cached is None:
+            # --- 3. Retrieve user-specific long-term memory ---
+            past_context = await memory.query(request.prompt, top_k=3, where={"user_id": request.user_id})
 
-        return {
-            "text": text,
-            "markdown": text,
-            "metadata": {"source": "groq", "model": request.model},
-        }
+            # --- 4. Build blog-specific system prompt ---
+            full_prompt = _BLOG_TEMPLATE.format(
+                past=past_context, history=history.joined, prompt=request.prompt
+            )
 
     except Exception as e:
         logger.exception("Failed to generate blog: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def event_stream():
+        if cached is not None:
+            history.append(f"User: {request.prompt}\nAI: {cached}")
+            yield _sse({"text": cached})
+            yield _sse({"metadata": {"source": "cache", "model": request.model}}, event="done")
+            return
+
+        # --- 5. Stream LLM output as it is generated ---
+        chunks = []
+        try:
+            async for delta in client.stream_text(
+                prompt=full_prompt,
+                model=request.model,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature
+            ):
+                chunks.append(delta)
+                yield _sse({"text": delta})
+        except Exception as e:
+            logger.exception("Failed to stream blog: %s", e)
+            yield _sse({"detail": str(e)}, event="error")
+            return
+
+        text = "".join(chunks).strip()
+        yield _sse({"metadata": {"source": "groq", "model": request.model}}, event="done")
+
+        # --- 6. Update cache, user-specific memory + history once complete ---
+        if not text:
+            # Nothing was generated; don't cache or remember an empty answer
+            return
+        try:
+            await prompt_cache.store("blog", request.user_id, prompt_embed, text, model=request.model)
+            await memory.add(request.prompt, text, user_id=request.user_id)
+        except Exception as e:
+            logger.exception("Failed to persist streamed blog: %s", e)
+        history.append(f"User: {request.prompt}\nAI: {text}")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 
 # ---------------- SOCIAL ---------------- #
 @router.post("/social")
@@ -85,28 +150,28 @@ async def generate_social_route(request: GenerateSocialRequest):
     try:
         client = get_groq_client()
 
-        # --- 1. Retrieve user-specific long-term memory ---
-        past_context = memory.query(f"{request.user_id}:{request.prompt}", top_k=3)
-
-        # --- 2. Fetch this user's conversation history ---
+        # --- 1. Fetch this user's conversation history ---
         history = social_histories[request.user_id]
-        conversation_snippets = "\n".join(history[-5:])
-
-        # --- 3. Build prompt ---
-        full_prompt = (
-           "You are a **social media strategist and content creator**.\n"
-           "Your ONLY job is to generate **short-form social content** "
-           "(tweets, LinkedIn posts, Instagram captions, content ideas).\n"
-           "You must NEVER answer general knowledge questions or unrelated topics.\n"
-           "If the user asks something outside social media content, politely remind them "
-           "that you can only create posts and ideas.\n\n"
-           "Use the following context to maintain style and continuity:\n\n"
-           f"Past posts/patterns:\n{past_context}\n\n"
-           f"Recent conversation:\n{conversation_snippets}\n\n"
-           f"User request:\n{request.prompt}"
+
+        # --- 2. Serve near-repeat requests from the cache ---
+        prompt_embed = await memory.embed_text(request.prompt)
+        text = await prompt_cache.lookup("social", request.user_id, prompt_embed, model=request.model)
+        if text is not None:
+            history.append(f"User: {request.prompt}\nAI: {text}")
+            return {
+                "text": text,
+                "markdown": text,
+                "metadata": {"source": "cache", "model": request.model},
+            }
+
+        # --- 3. Retrieve user-specific long-term memory ---
+        past_context = await memory.query(request.prompt, top_k=3, where={"user_id": request.user_id})
+
+        # --- 4. Build prompt and call LLM ---
+        full_prompt = _SOCIAL_TEMPLATE.format(
+            past=past_context, history=history.joined, prompt=request.prompt
         )
 
-        # --- 4. Call LLM ---
         text = await client.generate_text(
             prompt=full_prompt,
             model=request.model,
@@ -114,13 +179,11 @@ async def generate_social_route(request: GenerateSocialRequest):
             temperature=request.temperature
         )
 
-        # --- 5. Update memory + history ---
-        memory.add(f"{request.user_id}:{request.prompt}", text)
-        history.append(f"User: {request.prompt}\nAI: {text}")
-
-        # Trim history
-        if len(history) > MAX_HISTORY:
-            history.pop(0)
+        # --- 5. Update cache, memory + history (an empty answer is not worth keeping) ---
+        if text:
+            await prompt_cache.store("social", request.user_id, prompt_embed, text, model=request.model)
+            await memory.add(request.prompt, text, user_id=request.user_id)
+            history.append(f"User: {request.prompt}\nAI: {text}")
 
         return {
             "text": text,
@@ -10,46 +10,97 @@ This is intentionally lightweight. For deeper style transfer you'd use
 fine-tuning or retrieval-augmented generation with richer features.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from collections import Counter
-import re
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
 import asyncio
 import logging
+import numpy as np
 from app.services import memory
+from app.services.text_stats import count_words
 
 logger = logging.getLogger(__name__)
 
+# Documents above this count are counted across worker processes
+_PARALLEL_THRESHOLD = 32
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def start_executor() -> ProcessPoolExecutor:
+    """
+    Create the worker pool. Called at startup; workers come from a forkserver
+    (spawn where unavailable) so they are never forked from a process that
+    already runs threads. Workers preload text_stats and re-import __main__,
+    which is why main.py keeps the app out of its module-level imports.
+    """
+    global _executor
+    if _executor is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(["app.services.text_stats"])
+        else:
+            ctx = multiprocessing.get_context("spawn")
+        _executor = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=ctx)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
 async def analyze_documents(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Analyze a list of documents (each dict: {id, content, metadata}) and return
     a style profile summarizing typical patterns.
     """
-    # Run CPU-bound analysis in thread to avoid blocking if necessary
-    return await asyncio.to_thread(_analyze, documents)
+    if len(documents) <= _PARALLEL_THRESHOLD:
+        # Run CPU-bound analysis in thread to avoid blocking if necessary
+        return await asyncio.to_thread(_analyze, documents)
 
-def _analyze(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-    if not documents:
-        return {"summary": "no_docs", "word_freq": {}, "avg_length": 0}
+    # Map: count shards of the documents in worker processes
+    texts = [doc.get("content", "") for doc in documents]
+    n_shards = min(os.cpu_count() or 1, len(texts))
+    shard_size = -(-len(texts) // n_shards)
+    loop = asyncio.get_running_loop()
+    executor = start_executor()
+    partials = await asyncio.gather(*[
+        loop.run_in_executor(executor, count_words, texts[i:i + shard_size])
+        for i in range(0, len(texts), shard_size)
+    ])
 
-    lengths = []
+    # Reduce: merge partial counters and lengths
     word_counter = Counter()
     opening_phrases = Counter()
+    lengths = []
+    for words, openings, shard_lengths in partials:
+        word_counter += words
+        opening_phrases += openings
+        lengths.extend(shard_lengths)
+    return _build_profile(word_counter, opening_phrases, lengths)
 
-    for doc in documents:
-        text = doc.get("content", "")
-        words = re.findall(r"\w+", text.lower())
-        lengths.append(len(words))
-        word_counter.update(words)
-        # Opening phrase: first 20 words
-        first_words = " ".join(words[:20])
-        opening_phrases.update([first_words])
+def _analyze(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if not documents:
+        return {"summary": "no_docs", "word_freq": {}, "avg_length": 0}
 
+    word_counter, opening_phrases, lengths = count_words([doc.get("content", "") for doc in documents])
+    return _build_profile(word_counter, opening_phrases, lengths)
+
+def _build_profile(word_counter: Counter, opening_phrases: Counter, lengths: List[int]) -> Dict[str, Any]:
     most_common_words = word_counter.most_common(50)
     most_common_openings = opening_phrases.most_common(5)
 
+    # Linear-time selection of the (upper) median instead of a full sort
+    arr = np.fromiter(lengths, dtype=np.int64, count=len(lengths))
+    mid = len(arr) // 2
+
     profile = {
-        "avg_length_words": sum(lengths) / len(lengths),
-        "median_length_words": sorted(lengths)[len(lengths)//2],
+        "avg_length_words": float(arr.mean()),
+        "median_length_words": int(np.partition(arr, mid)[mid]),
         "most_common_words": most_common_words,
         "common_openings": most_common_openings,
     }
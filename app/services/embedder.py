@@ -0,0 +1,141 @@
+# app/services/embedder.py
+"""
+Sentence embedder running all-MiniLM-L6-v2 on ONNX Runtime.
+
+This module exposes:
+- load() to download the model/tokenizer and create the inference session
+- async def embed(text) -> np.ndarray (384-d, L2-normalized float32)
+
+Concurrent embed() calls are collected by a micro-batcher and sent through
+the model as a single padded batch, so the forward-pass overhead is shared.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import List, Optional
+import numpy as np
+import onnxruntime as ort
+from huggingface_hub import hf_hub_download
+from tokenizers import Tokenizer
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBED_DIM = 384
+_MAX_SEQ_LENGTH = 256
+
+_session: Optional[ort.InferenceSession] = None
+_tokenizer: Optional[Tokenizer] = None
+_input_names: set = set()
+_load_lock = threading.Lock()
+
+# Micro-batcher state (bound to the running event loop on first use)
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+
+
+def load():
+    """Download (if needed) and load the ONNX model and tokenizer."""
+    global _session, _tokenizer, _input_names
+    if _session is not None:
+        return _session
+
+    # Concurrent first callers wait here instead of each building a session
+    with _load_lock:
+        if _session is None:
+            model_path = hf_hub_download(settings.embedding_model, "onnx/model.onnx")
+            tokenizer_path = hf_hub_download(settings.embedding_model, "tokenizer.json")
+
+            tokenizer = Tokenizer.from_file(tokenizer_path)
+            tokenizer.enable_truncation(max_length=_MAX_SEQ_LENGTH)
+            tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+            session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            _tokenizer = tokenizer
+            _input_names = {i.name for i in session.get_inputs()}
+            _session = session
+            logger.info("Loaded embedding model %s", settings.embedding_model)
+    return _session
+
+
+def _run_batch(texts: List[str]) -> np.ndarray:
+    """Run one padded forward pass and mean-pool into normalized sentence vectors."""
+    encodings = _tokenizer.encode_batch(texts)
+    input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+    attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+    feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+    if "token_type_ids" in _input_names:
+        feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+    hidden = _session.run(None, feeds)[0]  # (batch, seq, dim)
+
+    # Mean pooling over real (non-padding) tokens, then L2 normalize
+    mask = attention_mask.astype(np.float32)
+    pooled = np.einsum("bsd,bs->bd", hidden, mask) / np.clip(mask.sum(axis=1, keepdims=True), 1e-9, None)
+    pooled /= np.linalg.norm(pooled, axis=1, keepdims=True) + 1e-12
+    return pooled.astype(np.float32, copy=False)
+
+
+async def _batch_worker():
+    loop = asyncio.get_running_loop()
+    max_batch = settings.embedding_batch_size
+    timeout = settings.embedding_batch_timeout_ms / 1000
+
+    while True:
+        batch = [await _queue.get()]
+
+        # Collect more pending requests until the batch is full or the window closes
+        deadline = loop.time() + timeout
+        while len(batch) < max_batch:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        texts = [text for text, _ in batch]
+        try:
+            vecs = await asyncio.to_thread(_run_batch, texts)
+        except Exception as exc:
+            logger.exception("Embedding batch of %d failed: %s", len(texts), exc)
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            continue
+
+        for (_, fut), vec in zip(batch, vecs):
+            if not fut.done():
+                fut.set_result(vec)
+
+
+async def embed(text: str) -> np.ndarray:
+    """
+    Embed a single text. Calls made concurrently are batched together.
+    """
+    global _queue, _worker
+    if _session is None:
+        await asyncio.to_thread(load)
+
+    if _worker is None or _worker.done():
+        _queue = asyncio.Queue()
+        _worker = asyncio.create_task(_batch_worker())
+
+    fut = asyncio.get_running_loop().create_future()
+    await _queue.put((text, fut))
+    return await fut
+
+
+async def close_embedder():
+    global _queue, _worker
+    if _worker is not None:
+        _worker.cancel()
+        try:
+            await _worker
+        except asyncio.CancelledError:
+            pass
+    _queue = None
+    _worker = None
@@ -7,8 +7,9 @@ Generator service composes prompt from:
 and then uses Groq client to generate text. It also supports Markdown export and JSON.
 """
 
+from app.config import settings
 from app.services.groq_client import get_groq_client
-from app.services import memory, analyzer
+from app.services import memory, analyzer, style_cache
 from typing import List, Dict, Any, Optional
 import asyncio
 import logging
@@ -16,12 +17,29 @@ import markdown2
 
 logger = logging.getLogger(__name__)
 
+# Caps in-flight Groq calls issued concurrently by this module (rate limits)
+_groq_semaphore = asyncio.Semaphore(settings.groq_max_concurrency)
+
 async def _retrieve_context(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     """
     Retrieve top_k relevant documents from memory for context.
     """
     return await memory.query(query, top_k=top_k)
 
+async def _get_style_profile(contexts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Return the style profile for contexts, reusing the cached one when the same ids come back.
+    """
+    key = tuple(sorted(str(c.get("id")) for c in contexts))
+    cached = style_cache.get(key)
+    if cached is not None:
+        return cached
+
+    profile = await analyzer.analyze_documents(contexts)
+    user_ids = frozenset((c.get("metadata") or {}).get("user_id") for c in contexts) - {None}
+    style_cache.put(key, profile, user_ids)
+    return profile
+
 def _compose_prompt(user_prompt: str, contexts: List[Dict[str, Any]], style_profile: Dict[str, Any], constraints: Optional[Dict[str,str]] = None) -> str:
     """
     Compose a single prompt that provides context and instructions to the LLM.
@@ -55,7 +73,7 @@ async def generate_blog(user_prompt: str, word_count: int = 1000, model: Optiona
     # Retrieve context
     contexts = await _retrieve_context(user_prompt, top_k=8)
     # Build style profile
-    style_profile = await analyzer.analyze_documents(contexts)
+    style_profile = await _get_style_profile(contexts)
     # Compose prompt with constraints
     constraints = {"target_word_count": str(word_count)}
     prompt = _compose_prompt(user_prompt + f"\nTarget words: {word_count}", contexts, style_profile, constraints)
@@ -79,16 +97,20 @@ async def generate_blog(user_prompt: str, word_count: int = 1000, model: Optiona
 
 async def generate_social(user_prompt: str, count: int = 5, platform: str = "linkedin", model: Optional[str] = None) -> Dict[str,Any]:
     contexts = await _retrieve_context(user_prompt, top_k=6)
-    style_profile = await analyzer.analyze_documents(contexts)
-    results = []
+    style_profile = await _get_style_profile(contexts)
     client = get_groq_client()
-    for i in range(count):
+
+    async def _generate_post(i: int) -> str:
         prompt = _compose_prompt(f"{user_prompt}\nCreate a single {platform} post. Keep concise and engaging.", contexts, style_profile, constraints={"post_index": str(i+1)})
-        try:
-            text = await client.generate_text(prompt=prompt, model=model, max_tokens=200, temperature=0.8)
-        except Exception as e:
-            logger.exception("Error generating social post #%d: %s", i+1, e)
-            text = f"[ERROR generating post {i+1}: {e}]"
+        async with _groq_semaphore:
+            return await client.generate_text(prompt=prompt, model=model, max_tokens=200, temperature=0.8)
+
+    texts = await asyncio.gather(*[_generate_post(i) for i in range(count)], return_exceptions=True)
+    results = []
+    for i, text in enumerate(texts):
+        if isinstance(text, Exception):
+            logger.error("Error generating social post #%d: %s", i+1, text, exc_info=text)
+            text = f"[ERROR generating post {i+1}: {text}]"
         results.append({"text": text})
     # Build markdown as bullet list
     md = "\n\n".join([f"- {r['text']}" for r in results])
@@ -4,11 +4,13 @@ Async Groq client wrapper using httpx.AsyncClient.
 
 This module exposes:
 - async def generate_text(prompt, model, max_tokens, temperature)
+- async def stream_text(prompt, model, max_tokens, temperature) -> async iterator of text deltas
 It uses settings from app.config but allows model override.
 """
 
 import httpx
-from typing import Optional
+import orjson
+from typing import AsyncIterator, Optional
 from app.config import settings
 import logging
 
@@ -22,22 +24,21 @@ class GroqClient:
         self.api_key = api_key or settings.groq_api_key
         self.base_url = base_url or settings.groq_base_url
         self.model = model or settings.groq_model
-        self._client = httpx.AsyncClient(timeout=30.0)
+        # One pooled HTTP/2 connection multiplexes concurrent completions; the
+        # transport retries connection failures before they reach the routes.
+        # (http2/limits must live on the transport when one is passed explicitly.)
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60),
+        )
+        self._client = httpx.AsyncClient(timeout=30.0, transport=transport)
         logger.debug("Initialized GroqClient with model=%s base_url=%s", self.model, self.base_url)
 
     async def close(self):
         await self._client.aclose()
 
-    async def generate_text(
-        self,
-        prompt: str,
-        model: Optional[str] = None,
-        max_tokens: int = 1024,
-        temperature: float = 0.8,
-        stop: Optional[list] = None,
-        **kwargs
-    ) -> str:
-        model_to_use = model or self.model
+    def _build_request(self, prompt: str, model: Optional[str], max_tokens: int, temperature: float, stop: Optional[list]):
         url = f"{self.base_url}/chat/completions"
 
         headers = {
@@ -46,7 +47,7 @@ class GroqClient:
         }
 
         payload = {
-            "model": model_to_use,
+            "model": model or self.model,
             "messages": [
                 {"role": "system", "content": "You are a helpful AI assistant."},
                 {"role": "user", "content": prompt}
@@ -58,8 +59,21 @@ class GroqClient:
         if stop:
             payload["stop"] = stop
 
+        return url, headers, payload
+
+    async def generate_text(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.8,
+        stop: Optional[list] = None,
+        **kwargs
+    ) -> str:
+        url, headers, payload = self._build_request(prompt, model, max_tokens, temperature, stop)
+
         try:
-            resp = await self._client.post(url, json=payload, headers=headers)
+            resp = await self._client.post(url, content=orjson.dumps(payload), headers=headers)
         except httpx.RequestError as exc:
             logger.exception("Network error when calling Groq: %s", exc)
             raise GroqClientError(f"RequestError: {exc}") from exc
@@ -67,7 +81,7 @@ class GroqClient:
         if resp.status_code >= 400:
             raise GroqClientError(f"Groq API error {resp.status_code}: {resp.text}")
 
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         # Extract assistant text
         text = None
@@ -88,6 +102,44 @@ class GroqClient:
 
         return text.strip()
 
+    async def stream_text(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.8,
+        stop: Optional[list] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream the completion as it is generated (SSE `stream: true`), yielding content deltas.
+        """
+        url, headers, payload = self._build_request(prompt, model, max_tokens, temperature, stop)
+        payload["stream"] = True
+
+        try:
+            async with self._client.stream("POST", url, content=orjson.dumps(payload), headers=headers) as resp:
+                if resp.status_code >= 400:
+                    await resp.aread()
+                    raise GroqClientError(f"Groq API error {resp.status_code}: {resp.text}")
+
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        delta = orjson.loads(data)["choices"][0].get("delta", {}).get("content")
+                    except (ValueError, KeyError, IndexError, TypeError):
+                        logger.warning("Skipping malformed Groq stream chunk: %s", data)
+                        continue
+                    if delta:
+                        yield delta
+        except httpx.RequestError as exc:
+            logger.exception("Network error when streaming from Groq: %s", exc)
+            raise GroqClientError(f"RequestError: {exc}") from exc
+
 
 # Singleton client
 _groq_client: Optional[GroqClient] = None
@@ -1,47 +1,103 @@
 """
-Memory service using ChromaDB as a vector store.
+Memory service backed by a pluggable vector store (sqlite-vec or ChromaDB,
+see app.services.vector_backends).
 
 This service supports:
-- add(prompt, response)
-- query(query_text, top_k)
+- add(prompt, response, user_id)
+- query(query_text, top_k, where)
 - delete(id)
+- embed_text(text) (memoized embeddings, shared with the prompt cache)
 """
 
-import chromadb
-from typing import Optional, List, Dict, Any
+from cachetools import LRUCache
+from typing import Optional, List, Dict, Any, Tuple
+import hashlib
+import threading
 import uuid
 import asyncio
 import logging
 from app.config import settings
+from app.services import embedder, style_cache
+from app.services.vector_backends import get_backend
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
-# Initialize chroma client lazily
-_client = None
-_collection_name = "user_content"
-
-
-def _ensure_client():
-    """Initialize persistent Chroma client (new API)."""
-    global _client
-    if _client is None:
-        persist_dir = settings.chroma_persist_dir
-        _client = chromadb.PersistentClient(path=persist_dir)
-        logger.info("Initialized Chroma PersistentClient with persist_dir=%s", persist_dir)
-    return _client
+# Vector store collection handle, initialized lazily
+_collection = None
+# Vectors are 384-d MiniLM embeddings; the old 1536-d hash vectors lived in "user_content"
+_collection_name = "user_content_minilm"
+# Documents known to this process (stored + buffered); lets query skip empty stores.
+# A shared store can be written by other workers, so a zero is re-checked before use.
+_doc_count = 0
+
+# Write buffer: save_document enqueues (id, content, metadata, vector) and the
+# background flusher drains it into a single batched add
+_PENDING: List[Tuple[str, str, Dict[str, Any], np.ndarray]] = []
+_pending_lock = asyncio.Lock()
+_flush_wakeup = asyncio.Event()
+_flusher_task: Optional[asyncio.Task] = None
+# Set by stop_flusher; the flusher exits after its in-flight flush completes
+_flusher_stopping = False
+# Documents that failed to write are requeued, then dropped after this many flushes
+_MAX_FLUSH_ATTEMPTS = 3
+_flush_attempts: Dict[str, int] = {}
+
+
+def _ensure_collection():
+    """Return the cached user content collection, creating it on first use."""
+    global _collection, _doc_count
+    if _collection is None:
+        _collection = get_backend(_collection_name)
+        _doc_count = _collection.count()
+    return _collection
 
 
 async def _run_in_thread(fn, *args, **kwargs):
     return await asyncio.to_thread(fn, *args, **kwargs)
 
 
+# Embedding memoization: sha256(text) -> read-only vector
+_EMBED_CACHE = LRUCache(maxsize=4096)
+_embed_cache_lock = threading.Lock()
+_embed_cache_hits = 0
+_embed_cache_misses = 0
+
+
+async def embed_text(text: str) -> np.ndarray:
+    """
+    Return the embedding for text, reusing a cached vector when the same text was seen before.
+    """
+    global _embed_cache_hits, _embed_cache_misses
+    key = hashlib.sha256(text.encode("utf-8")).digest()
+
+    with _embed_cache_lock:
+        vec = _EMBED_CACHE.get(key)
+        if vec is not None:
+            _embed_cache_hits += 1
+    if vec is not None:
+        logger.debug("Embedding cache hit (hits=%d misses=%d)", _embed_cache_hits, _embed_cache_misses)
+        return vec
+
+    # embed() returns a row view of its whole batch; copy so the cache doesn't pin the batch
+    vec = (await embedder.embed(text)).copy()
+    vec.flags.writeable = False
+
+    with _embed_cache_lock:
+        _EMBED_CACHE[key] = vec
+        _embed_cache_misses += 1
+    logger.debug("Embedding cache miss (hits=%d misses=%d)", _embed_cache_hits, _embed_cache_misses)
+    return vec
+
+
 # ✅ NEW: Friendly `add` wrapper to rhyme with generate.py
-async def add(prompt: str, response: str):
+async def add(prompt: str, response: str, user_id: Optional[str] = None):
     """
-    Store a prompt/response pair in memory.
+    Store a prompt/response pair in memory, tagged with user_id for filtered queries.
     """
     metadata = {"prompt": prompt}
+    if user_id is not None:
+        metadata["user_id"] = user_id
     content = response
     return await save_document(id=None, content=content, metadata=metadata)
 
@@ -53,95 +109,168 @@ async def save_document(
     embed: Optional[List[float]] = None,
 ):
     """
-    Save a document into Chroma. If embed is None, use a simple text embedding fallback
-    (replace with a proper embedding model in production).
+    Save a document into the vector store. If embed is None, the content is embedded with
+    the MiniLM embedder. Writes are buffered and persisted by the background
+    flusher, so the returned id may take up to one flush interval to become queryable.
     """
-    client = _ensure_client()
-
-    # Create or get collection
-    coll = client.get_or_create_collection(name=_collection_name, metadata={"hnsw:space": "cosine"})
-
+    global _doc_count
     if id is None:
         id = str(uuid.uuid4())
 
     metadata = metadata or {}
 
-    # If embed provided, use it. Otherwise compute fallback embedding
-    vec = embed if embed is not None else _simple_text_to_vector(content)
+    # If embed provided, use it. Otherwise compute the embedding
+    vec = np.asarray(embed, dtype=np.float32) if embed is not None else await embed_text(content)
 
-    def _add():
-        coll.add(documents=[content], metadatas=[metadata], ids=[id], embeddings=[list(vec)])
+    # Seed the count before incrementing it
+    _ensure_collection()
+    async with _pending_lock:
+        _PENDING.append((id, content, metadata, vec))
+        _doc_count += 1
+        if len(_PENDING) >= settings.memory_flush_batch_size:
+            _flush_wakeup.set()
 
-    await _run_in_thread(_add)
-    logger.debug("Saved document id=%s len=%d", id, len(content))
-    return id
+    # Without a running flusher (e.g. scripts), write through immediately
+    if _flusher_task is None:
+        await flush()
 
+    # Cached style profiles for this user may no longer reflect their documents
+    if metadata.get("user_id"):
+        style_cache.invalidate_user(metadata["user_id"])
 
-async def query(query_text: str, top_k: int = 5):
-    """
-    Query relevant documents using simple vector retrieval.
-    """
-    client = _ensure_client()
-    coll = client.get_or_create_collection(name=_collection_name, metadata={"hnsw:space": "cosine"})
-
-    # Compute embedding for query_text
-    qvec = _simple_text_to_vector(query_text)
-
-    def _query():
-        return coll.query(
-            query_embeddings=[list(qvec)],
-            n_results=top_k,
-            include=["metadatas", "documents", "distances"],
-        )
-
-    res = await _run_in_thread(_query)
-
-    results = []
-    if res and "documents" in res and len(res["documents"]) > 0:
-        docs = res["documents"][0]
-        metas = res["metadatas"][0]
-        dists = res["distances"][0]
-
-        for i, content in enumerate(docs):
-            results.append(
-                {
-                    "id": metas[i].get("id", str(i)),
-                    "content": content,
-                    "metadata": metas[i],
-                    "distance": float(dists[i]) if dists is not None else None,
-                }
-            )
-    return results
-
-
-async def delete(id: str):
-    client = _ensure_client()
-    coll = client.get_or_create_collection(name=_collection_name, metadata={"hnsw:space": "cosine"})
+    logger.debug("Queued document id=%s len=%d", id, len(content))
+    return id
 
-    def _del():
-        coll.delete(ids=[id])
 
-    await _run_in_thread(_del)
-    return True
+def _columns(batch):
+    ids, contents, metadatas, vecs = zip(*batch)
+    return list(ids), list(contents), list(metadatas), np.stack(vecs)
 
 
-def _simple_text_to_vector(text: str, dim: int = 1536):
+async def flush():
+    """
+    Write all buffered documents to the vector store in one batched add.
+    If the batch is rejected, documents are retried one by one and the
+    failures requeued for the next flush.
     """
-    Deterministic but simple text->vector mapping: hash chunks into a vector.
-    Replace this with a real embedding model in production.
+    global _doc_count
+    async with _pending_lock:
+        if not _PENDING:
+            return
+        batch = _PENDING[:]
+        _PENDING.clear()
+
+    # A repeated id fails the whole batched add; keep the first occurrence
+    seen = set()
+    unique = []
+    for item in batch:
+        if item[0] not in seen:
+            seen.add(item[0])
+            unique.append(item)
+    if len(unique) < len(batch):
+        _doc_count -= len(batch) - len(unique)
+        logger.warning("Dropped %d duplicate ids from memory flush", len(batch) - len(unique))
+
+    coll = _ensure_collection()
+    failed = []
+    try:
+        await _run_in_thread(coll.add, *_columns(unique))
+    except Exception as exc:
+        logger.warning("Batched add of %d documents failed (%s); retrying individually", len(unique), exc)
+        for item in unique:
+            try:
+                await _run_in_thread(coll.add, *_columns([item]))
+            except Exception:
+                failed.append(item)
+
+    failed_ids = {item[0] for item in failed}
+    for id in seen - failed_ids:
+        _flush_attempts.pop(id, None)
+
+    retry = []
+    for item in failed:
+        attempts = _flush_attempts.get(item[0], 0) + 1
+        if attempts >= _MAX_FLUSH_ATTEMPTS:
+            _flush_attempts.pop(item[0], None)
+            _doc_count -= 1
+            logger.error("Dropping document id=%s after %d failed writes", item[0], attempts)
+        else:
+            _flush_attempts[item[0]] = attempts
+            retry.append(item)
+
+    if retry:
+        async with _pending_lock:
+            _PENDING[:0] = retry
+    logger.debug("Flushed %d documents (%d requeued)", len(unique) - len(failed), len(retry))
+
+
+async def _flusher():
+    interval = settings.memory_flush_interval_ms / 1000
+    while True:
+        try:
+            await asyncio.wait_for(_flush_wakeup.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        _flush_wakeup.clear()
+        try:
+            await flush()
+        except Exception as exc:
+            logger.exception("Failed to flush memory writes: %s", exc)
+        if _flusher_stopping:
+            return
+
+
+def start_flusher():
+    global _flusher_task, _flusher_stopping
+    if _flusher_task is None:
+        _flusher_stopping = False
+        _flusher_task = asyncio.create_task(_flusher())
+
+
+async def stop_flusher():
+    """Stop the background flusher and write out anything still buffered."""
+    global _flusher_task, _flusher_stopping
+    if _flusher_task is not None:
+        # Cancelling could interrupt a flush after it took its batch off _PENDING;
+        # signal instead and let the in-flight flush finish
+        _flusher_stopping = True
+        _flush_wakeup.set()
+        await _flusher_task
+        _flusher_task = None
+
+    # Drain, giving requeued documents their remaining attempts
+    for _ in range(_MAX_FLUSH_ATTEMPTS):
+        if not _PENDING:
+            break
+        await flush()
+
+
+async def query(query_text: str, top_k: int = 5, where: Optional[Dict[str, Any]] = None):
     """
-    import hashlib
+    Query relevant documents by embedding similarity, optionally filtered on
+    metadata (e.g. where={"user_id": ...}).
+    """
+    global _doc_count
+    coll = _ensure_collection()
+    if _doc_count <= 0:
+        # Never trust a cached zero: another worker may have written since
+        _doc_count = await _run_in_thread(coll.count) + len(_PENDING)
+        if _doc_count == 0:
+            return []
 
-    h = hashlib.sha256(text.encode("utf-8")).digest()
-    arr = np.frombuffer(h, dtype=np.uint8).astype(np.float32)
+    # Compute embedding for query_text
+    qvec = await embed_text(query_text)
 
-    # Expand/repeat to requested dim
-    if arr.size < dim:
-        reps = int(np.ceil(dim / arr.size))
-        arr = np.tile(arr, reps)[:dim]
-    else:
-        arr = arr[:dim]
+    return await _run_in_thread(coll.query, qvec, top_k, where)
 
-    # Normalize
-    v = arr / (np.linalg.norm(arr) + 1e-8)
-    return v.tolist()
+
+async def delete(id: str):
+    global _doc_count
+    coll = _ensure_collection()
+    await _run_in_thread(coll.delete, [id])
+
+    # The id may not have existed; resync rather than report an empty store by mistake
+    _doc_count -= 1
+    if _doc_count <= 0:
+        _doc_count = await _run_in_thread(coll.count) + len(_PENDING)
+    return True
@@ -0,0 +1,85 @@
+# app/services/prompt_cache.py
+"""
+Semantic prompt -> response cache stored in per-route vector store collections.
+
+This module exposes:
+- async def lookup(route, user_id, prompt_embed, model) -> Optional[str]
+- async def store(route, user_id, prompt_embed, response, model)
+
+Entries are keyed by the embedding of the user's request text (not the templated
+prompt, whose tail is cut off by the embedder's sequence limit) and filtered by user.
+A lookup hits when a cached request lies within settings.prompt_cache_threshold
+(cosine distance), was answered by the same model and is younger than
+settings.prompt_cache_ttl_s. Conversation history and retrieved memory are left
+out of the match: both change after every answer, so no request would ever
+repeat exactly. Each collection is capped at
+settings.prompt_cache_max_entries, dropping the oldest entries first.
+"""
+
+from typing import Optional
+import time
+import uuid
+import asyncio
+import logging
+import numpy as np
+from app.config import settings
+from app.services.vector_backends import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Nearest entries checked per lookup; repeats of one request (e.g. under another model) sit at ~0 distance
+_CANDIDATES = 5
+
+
+# Routes with a cache collection, opened at startup by warm_up()
+ROUTES = ("blog", "social")
+
+
+def _collection(route: str):
+    return get_backend(f"prompt_cache_{route}")
+
+
+def warm_up():
+    """
+    Open every route's collection. Opening a sqlite-vec collection may backfill
+    its index (e.g. after toggling use_int8), so call this from a thread at
+    startup rather than on the event loop during the first request.
+    """
+    for route in ROUTES:
+        _collection(route)
+
+
+async def lookup(route: str, user_id: str, prompt_embed: np.ndarray, model: Optional[str] = None) -> Optional[str]:
+    """
+    Return the cached response for a near-identical earlier request, or None on a miss.
+    """
+    coll = _collection(route)
+    res = await asyncio.to_thread(coll.query, prompt_embed, _CANDIDATES, {"user_id": user_id})
+
+    oldest = time.time() - settings.prompt_cache_ttl_s
+    for entry in res:
+        meta = entry["metadata"] or {}
+        if entry["distance"] >= settings.prompt_cache_threshold:
+            break
+        if meta.get("model", "") == (model or "") and meta.get("created_at", 0) >= oldest:
+            logger.debug("Prompt cache hit (route=%s distance=%.4f)", route, entry["distance"])
+            return entry["content"]
+    return None
+
+
+async def store(route: str, user_id: str, prompt_embed: np.ndarray, response: str, model: Optional[str] = None):
+    """
+    Cache a generated response under its request embedding, then enforce the size cap.
+    """
+    coll = _collection(route)
+    metadata = {
+        "user_id": user_id,
+        "model": model or "",
+        "created_at": time.time(),
+    }
+
+    def _add():
+        coll.add([str(uuid.uuid4())], [response], [metadata], prompt_embed.reshape(1, -1))
+        coll.trim(settings.prompt_cache_max_entries)
+
+    await asyncio.to_thread(_add)
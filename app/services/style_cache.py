@@ -0,0 +1,37 @@
+# app/services/style_cache.py
+"""
+Cache of style profiles keyed by the ids of the contexts they were built from.
+
+Kept dependency-free so memory can invalidate a user's profiles on write
+without importing the generator. Each user maps to the keys built from their
+documents, so invalidation pops one entry instead of scanning the cache.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, Optional
+from cachetools import TTLCache
+
+_PROFILE_TTL_S = 600
+
+# Context-id key -> style profile
+_PROFILES = TTLCache(maxsize=1024, ttl=_PROFILE_TTL_S)
+# user_id -> set of keys whose profile used that user's documents
+_KEYS_BY_USER = TTLCache(maxsize=1024, ttl=_PROFILE_TTL_S)
+
+
+def get(key: Hashable) -> Optional[Dict[str, Any]]:
+    return _PROFILES.get(key)
+
+
+def put(key: Hashable, profile: Dict[str, Any], user_ids: Iterable[str]):
+    _PROFILES[key] = profile
+    for user_id in user_ids:
+        keys = _KEYS_BY_USER.get(user_id) or set()
+        keys.add(key)
+        # Reassigning refreshes the entry's TTL along with the profile's
+        _KEYS_BY_USER[user_id] = keys
+
+
+def invalidate_user(user_id: str):
+    """Drop cached profiles built from this user's documents."""
+    for key in _KEYS_BY_USER.pop(user_id, ()):
+        _PROFILES.pop(key, None)
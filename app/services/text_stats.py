@@ -0,0 +1,30 @@
+# app/services/text_stats.py
+"""
+Word/opening counters for the style analyzer.
+
+Kept free of app imports (settings, vector stores, ONNX) because it is the
+function run inside the analyzer's worker processes.
+"""
+
+from typing import List, Tuple
+from collections import Counter
+import re
+
+WORD_RE = re.compile(r"\w+")
+
+
+def count_words(texts: List[str]) -> Tuple[Counter, Counter, List[int]]:
+    """Return (word counts, opening-phrase counts, per-text word lengths)."""
+    lengths = []
+    word_counter = Counter()
+    opening_phrases = Counter()
+
+    for text in texts:
+        words = WORD_RE.findall(text.lower())
+        lengths.append(len(words))
+        word_counter.update(words)
+        # Opening phrase: first 20 words
+        first_words = " ".join(words[:20])
+        opening_phrases.update([first_words])
+
+    return word_counter, opening_phrases, lengths
@@ -0,0 +1,37 @@
+# app/services/vector_backends/__init__.py
+"""
+Vector store backends for the memory service and prompt cache.
+
+Each backend manages one named collection and exposes synchronous methods
+(callers run them in a thread):
+- add(ids, documents, metadatas, embeddings)
+- query(embedding, top_k, where=None) -> [{id, content, metadata, distance}]
+- delete(ids)
+- count()
+- trim(max_entries) to drop the oldest entries beyond a cap
+
+`where` is an equality filter on metadata ({"user_id": ...}).
+The implementation is chosen with settings.vector_backend ("sqlite-vec" | "chroma").
+Only the selected backend's dependency is imported.
+"""
+
+from typing import Dict, Any
+from app.config import settings
+
+_backends: Dict[str, Any] = {}
+
+
+def get_backend(name: str):
+    """Return the (cached) backend instance for collection `name`."""
+    backend = _backends.get(name)
+    if backend is None:
+        if settings.vector_backend == "sqlite-vec":
+            from app.services.vector_backends.sqlite_vec import SqliteVecBackend
+            backend = SqliteVecBackend(name)
+        elif settings.vector_backend == "chroma":
+            from app.services.vector_backends.chroma import ChromaBackend
+            backend = ChromaBackend(name)
+        else:
+            raise ValueError(f"Unknown vector backend: {settings.vector_backend}")
+        _backends[name] = backend
+    return backend
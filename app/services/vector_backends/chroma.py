@@ -0,0 +1,79 @@
+# app/services/vector_backends/chroma.py
+"""
+ChromaDB backend: one Chroma collection per backend instance, sharing a
+single client (HTTP client if chroma_host is set, otherwise persistent).
+"""
+
+from typing import Any, Dict, List, Optional
+import logging
+import chromadb
+import numpy as np
+from app.config import settings
+from app.services.embedder import EMBED_DIM
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def _ensure_client():
+    """Initialize the Chroma client: HTTP client if chroma_host is set, otherwise persistent (new API)."""
+    global _client
+    if _client is None:
+        if settings.chroma_host:
+            _client = chromadb.HttpClient(host=settings.chroma_host, port=settings.chroma_port)
+            logger.info("Initialized Chroma HttpClient for %s:%s", settings.chroma_host, settings.chroma_port)
+        else:
+            persist_dir = settings.chroma_persist_dir
+            _client = chromadb.PersistentClient(path=persist_dir)
+            logger.info("Initialized Chroma PersistentClient with persist_dir=%s", persist_dir)
+    return _client
+
+
+class ChromaBackend:
+    def __init__(self, name: str):
+        self.name = name
+        self._collection = _ensure_client().get_or_create_collection(
+            name=name, metadata={"hnsw:space": "cosine", "embedding_dim": EMBED_DIM}
+        )
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: np.ndarray):
+        self._collection.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def query(self, embedding: np.ndarray, top_k: int, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        res = self._collection.query(
+            query_embeddings=embedding.reshape(1, -1),
+            n_results=top_k,
+            where=where or None,
+            include=["metadatas", "documents", "distances"],
+        )
+
+        results = []
+        if res and "documents" in res and len(res["documents"]) > 0:
+            ids = res["ids"][0]
+            docs = res["documents"][0]
+            metas = res["metadatas"][0]
+            dists = res["distances"][0] if res.get("distances") is not None else None
+
+            for i, content in enumerate(docs):
+                results.append(
+                    {
+                        "id": ids[i],
+                        "content": content,
+                        "metadata": metas[i],
+                        "distance": float(dists[i]) if dists is not None else None,
+                    }
+                )
+        return results
+
+    def delete(self, ids: List[str]):
+        self._collection.delete(ids=ids)
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def trim(self, max_entries: int):
+        excess = self._collection.count() - max_entries
+        if excess > 0:
+            oldest = self._collection.get(limit=excess, include=[])
+            self._collection.delete(ids=oldest["ids"])
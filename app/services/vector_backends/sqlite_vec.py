@@ -0,0 +1,196 @@
+# app/services/vector_backends/sqlite_vec.py
+"""
+sqlite-vec backend: documents live in a plain table and vectors in a `vec0`
+virtual table sharing its rowid, so KNN is a single SQL query.
+
+With settings.use_int8 the vec0 index holds int8-quantized vectors (4x smaller);
+the search over-fetches candidates and re-ranks them with exact float32 cosine
+against the originals kept in the documents table. The float and int8 indexes
+are separate tables; whichever is active is backfilled from the stored originals
+on startup, so toggling the setting keeps every document searchable.
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import sqlite3
+import threading
+import numpy as np
+import sqlite_vec
+from app.config import settings
+from app.services.embedder import EMBED_DIM
+
+logger = logging.getLogger(__name__)
+
+# Candidates fetched from the int8 index per requested result, before float32 re-ranking
+_INT8_OVERFETCH = 4
+
+# Metadata keys mirrored into vec0 metadata columns so `where` filters run inside the KNN scan
+_FILTER_COLUMNS = ("user_id",)
+
+
+def _quantize_int8(v: np.ndarray) -> np.ndarray:
+    """Scale a normalized float vector to int8."""
+    return np.clip(np.round(v * 127), -128, 127).astype(np.int8)
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+class SqliteVecBackend:
+    def __init__(self, name: str, path: str = None, dim: int = EMBED_DIM, use_int8: bool = None):
+        if not name.isidentifier():
+            raise ValueError(f"Invalid collection name for sqlite-vec: {name}")
+        self.name = name
+        self._int8 = settings.use_int8 if use_int8 is None else use_int8
+        self._float_table = f"vec_{name}"
+        self._vec_table = f"vec_{name}_int8" if self._int8 else self._float_table
+        self._lock = threading.Lock()
+        self._conn = _connect(path or settings.sqlite_vec_path)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} ("
+                "rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, document TEXT, metadata TEXT, embedding BLOB)"
+            )
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({name})")}
+            if "embedding" not in columns:
+                self._conn.execute(f"ALTER TABLE {name} ADD COLUMN embedding BLOB")
+            self._conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self._vec_table} "
+                f"USING vec0(embedding {'int8' if self._int8 else 'float'}[{dim}] distance_metric=cosine, "
+                + ", ".join(f"{column} text" for column in _FILTER_COLUMNS)
+                + ")"
+            )
+            self._backfill()
+        logger.info("Initialized sqlite-vec collection %s (dim=%d, int8=%s)", name, dim, self._int8)
+
+    def _existing_vec_tables(self) -> List[str]:
+        tables = [self._float_table, f"vec_{self.name}_int8"]
+        placeholders = ", ".join("?" for _ in tables)
+        rows = self._conn.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})", tables
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _backfill(self):
+        """Index documents missing from the active vec table (e.g. after toggling use_int8)."""
+        # Rows written before originals were stored: recover them from the float index
+        if self._float_table in self._existing_vec_tables():
+            self._conn.execute(
+                f"UPDATE {self.name} SET embedding = "
+                f"(SELECT v.embedding FROM {self._float_table} v WHERE v.rowid = {self.name}.rowid) "
+                "WHERE embedding IS NULL"
+            )
+
+        # Drop index rows whose documents were deleted while this table was inactive
+        self._conn.execute(f"DELETE FROM {self._vec_table} WHERE rowid NOT IN (SELECT rowid FROM {self.name})")
+
+        rows = self._conn.execute(
+            f"SELECT rowid, metadata, embedding FROM {self.name} "
+            f"WHERE embedding IS NOT NULL AND rowid NOT IN (SELECT rowid FROM {self._vec_table})"
+        ).fetchall()
+        for rowid, metadata, embedding in rows:
+            self._insert_vector(rowid, np.frombuffer(embedding, dtype=np.float32), json.loads(metadata or "{}"))
+        if rows:
+            logger.info("Backfilled %d vectors into %s", len(rows), self._vec_table)
+
+    def _insert_vector(self, rowid: int, vec: np.ndarray, metadata: Dict[str, Any]):
+        expr, value = self._vector_param(vec)
+        filters = [str(metadata.get(column, "")) for column in _FILTER_COLUMNS]
+        self._conn.execute(
+            f"INSERT INTO {self._vec_table} (rowid, embedding, {', '.join(_FILTER_COLUMNS)}) "
+            f"VALUES (?, {expr}, {', '.join('?' for _ in _FILTER_COLUMNS)})",
+            (rowid, value, *filters),
+        )
+
+    def _vector_param(self, vec: np.ndarray):
+        """Return the SQL expression and bound value for a vector in this index's format."""
+        if self._int8:
+            return "vec_int8(?)", _quantize_int8(vec).tobytes()
+        return "?", vec.tobytes()
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: np.ndarray):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock, self._conn:
+            for id, document, metadata, vec in zip(ids, documents, metadatas, embeddings):
+                # Like Chroma's add, an existing id is left untouched
+                cur = self._conn.execute(
+                    f"INSERT INTO {self.name} (id, document, metadata, embedding) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO NOTHING",
+                    (id, document, json.dumps(metadata or {}), vec.tobytes()),
+                )
+                if cur.rowcount:
+                    self._insert_vector(cur.lastrowid, vec, metadata or {})
+
+    def query(self, embedding: np.ndarray, top_k: int, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        where = where or {}
+        unsupported = set(where) - set(_FILTER_COLUMNS)
+        if unsupported:
+            raise ValueError(f"sqlite-vec backend cannot filter on: {sorted(unsupported)}")
+        filter_sql = "".join(f" AND {column} = ?" for column in where)
+
+        embedding = np.asarray(embedding, dtype=np.float32)
+        expr, value = self._vector_param(embedding)
+        k = top_k * _INT8_OVERFETCH if self._int8 else top_k
+        # float32 originals are only needed for the int8 re-rank
+        originals = "d.embedding" if self._int8 else "NULL"
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"WITH knn AS ("
+                f"SELECT rowid, distance FROM {self._vec_table} WHERE embedding MATCH {expr} AND k = ?{filter_sql}"
+                f") "
+                f"SELECT d.id, d.document, d.metadata, knn.distance, {originals} "
+                f"FROM knn JOIN {self.name} d ON d.rowid = knn.rowid ORDER BY knn.distance",
+                (value, k, *(str(v) for v in where.values())),
+            ).fetchall()
+
+        if self._int8 and rows:
+            rows = self._rerank(embedding, rows, top_k)
+
+        return [
+            {"id": id, "content": document, "metadata": json.loads(metadata), "distance": float(distance)}
+            for id, document, metadata, distance, _ in rows
+        ]
+
+    @staticmethod
+    def _rerank(embedding: np.ndarray, rows: list, top_k: int) -> list:
+        """Order int8 candidates by exact float32 cosine distance and keep top_k."""
+        originals = np.stack([np.frombuffer(row[4], dtype=np.float32) for row in rows])
+        norms = np.linalg.norm(originals, axis=1) * np.linalg.norm(embedding) + 1e-12
+        distances = 1.0 - (originals @ embedding) / norms
+        order = np.argsort(distances)[:top_k]
+        return [(*rows[i][:3], distances[i], None) for i in order]
+
+    def _delete_rowids(self, rowids: List[tuple]):
+        # The inactive index is backfilled later, so it must not keep deleted rows either
+        for table in self._existing_vec_tables():
+            self._conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", rowids)
+        self._conn.executemany(f"DELETE FROM {self.name} WHERE rowid = ?", rowids)
+
+    def delete(self, ids: List[str]):
+        with self._lock, self._conn:
+            rowids = []
+            for id in ids:
+                row = self._conn.execute(f"SELECT rowid FROM {self.name} WHERE id = ?", (id,)).fetchone()
+                if row is not None:
+                    rowids.append(row)
+            self._delete_rowids(rowids)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def trim(self, max_entries: int):
+        with self._lock, self._conn:
+            rowids = self._conn.execute(
+                f"SELECT rowid FROM {self.name} ORDER BY rowid DESC LIMIT -1 OFFSET ?", (max_entries,)
+            ).fetchall()
+            self._delete_rowids(rowids)